@@ -31,11 +31,12 @@ To disable the peers monitoring, use the `--standalone` CLI option.
 
 import asyncio
 import datetime
+import functools
 import getpass
 import logging
 import os
 import random
-from typing import Any, Dict, Iterable, Mapping, NewType, NoReturn, Optional, Union, cast
+from typing import Any, Dict, Iterable, List, Mapping, NewType, NoReturn, Optional, Union, cast
 
 import iso8601
 
@@ -51,6 +52,16 @@ NAMESPACED_PEERING_RESOURCE = resources.Resource('zalando.org', 'v1', 'kopfpeeri
 
 Identity = NewType('Identity', str)
 
+# The alphabet for the random suffixes of the auto-generated identities.
+_ID_ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+# The same `lastseen` strings recur in every peering event until the peers touch their status,
+# so parse each of them only once. The cached naive datetimes are immutable, so safe to share.
+@functools.lru_cache(maxsize=512)
+def _parse_date_cached(s: str) -> datetime.datetime:
+    return iso8601.parse_date(s).replace(tzinfo=None)
+
 
 # The class used to represent a peer in the parsed peers list (for convenience).
 # The extra fields are for easier calculation when and if the peer is dead to the moment.
@@ -63,19 +74,22 @@ class Peer:
             priority: int = 0,
             lastseen: Optional[Union[str, datetime.datetime]] = None,
             lifetime: Union[int, datetime.timedelta] = 60,
+            now: Optional[datetime.datetime] = None,
             **_: Any,  # for the forward-compatibility with the new fields
     ):
         super().__init__()
+        now = now if now is not None else datetime.datetime.utcnow()
         self.identity = identity
         self.priority = priority
         self.lifetime = (lifetime if isinstance(lifetime, datetime.timedelta) else
                          datetime.timedelta(seconds=int(lifetime)))
         self.lastseen = (lastseen if isinstance(lastseen, datetime.datetime) else
+                         _parse_date_cached(lastseen) if isinstance(lastseen, str) else
                          iso8601.parse_date(lastseen) if lastseen is not None else
-                         datetime.datetime.utcnow())
+                         now)
         self.lastseen = self.lastseen.replace(tzinfo=None)  # only the naive utc -- for comparison
         self.deadline = self.lastseen + self.lifetime
-        self.is_dead = self.deadline <= datetime.datetime.utcnow()
+        self.is_dead = self.deadline <= now
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(identity={self.identity}, priority={self.priority}, lastseen={self.lastseen}, lifetime={self.lifetime})"
@@ -109,37 +123,54 @@ async def process_peering_event(
     and to all the resource handlers to check its value when the events arrive
     (see `create_tasks` and `run` functions).
     """
-    body: bodies.RawBody = raw_event['object']
+    peering = settings.peering
     meta: bodies.RawMeta = raw_event['object']['metadata']
 
     # Silently ignore the peering objects which are not ours to worry.
-    if meta.get('namespace') != namespace or meta.get('name') != settings.peering.name:
+    # The name is more selective than the namespace, so it is checked first.
+    if meta.get('name') != peering.name or meta.get('namespace') != namespace:
         return
 
+    body: bodies.RawBody = raw_event['object']
+
     # Find if we are still the highest priority operator.
+    # All peers are judged against the same moment, so that the decision is consistent.
+    now = datetime.datetime.utcnow()
+    own_prio = peering.priority
     pairs = cast(Mapping[str, Mapping[str, object]], body.get('status', {}))
-    peers = [Peer(identity=Identity(opid), **opinfo) for opid, opinfo in pairs.items()]
-    dead_peers = [peer for peer in peers if peer.is_dead]
-    live_peers = [peer for peer in peers if not peer.is_dead and peer.identity != identity]
-    prio_peers = [peer for peer in live_peers if peer.priority > settings.peering.priority]
-    same_peers = [peer for peer in live_peers if peer.priority == settings.peering.priority]
+    peers = [Peer(identity=Identity(opid), now=now, **opinfo) for opid, opinfo in pairs.items()]
+    dead_peers: List[Peer] = []
+    prio_peers: List[Peer] = []
+    same_peers: List[Peer] = []
+    for peer in peers:
+        if peer.is_dead:
+            dead_peers.append(peer)
+        elif peer.identity == identity:
+            pass
+        elif peer.priority > own_prio:
+            prio_peers.append(peer)
+        elif peer.priority == own_prio:
+            same_peers.append(peer)
 
     if autoclean and dead_peers:
-        await clean(peers=dead_peers, settings=settings, namespace=namespace)
+        await clean(identities=[peer.identity for peer in dead_peers],
+                    settings=settings, namespace=namespace)
 
-    if prio_peers:
-        if freeze_mode.is_off():
-            logger.info(f"Freezing operations in favour of {prio_peers}.")
-            await freeze_mode.turn_on()
-    elif same_peers:
+    if same_peers and not prio_peers:
         logger.warning(f"Possibly conflicting operators with the same priority: {same_peers}.")
-        if freeze_mode.is_off():
+
+    # Most events change nothing, so only react to the actual transitions of the freeze mode.
+    was_on = freeze_mode.is_on()
+    want_on = bool(prio_peers) or bool(same_peers)
+    if want_on and not was_on:
+        if prio_peers:
+            logger.info(f"Freezing operations in favour of {prio_peers}.")
+        else:
             logger.warning(f"Freezing all operators, including self: {peers}")
-            await freeze_mode.turn_on()
-    else:
-        if freeze_mode.is_on():
-            logger.info(f"Resuming operations after the freeze. Conflicting operators with the same priority are gone.")
-            await freeze_mode.turn_off()
+        await freeze_mode.turn_on()
+    elif was_on and not want_on:
+        logger.info(f"Resuming operations after the freeze. Conflicting operators with the same priority are gone.")
+        await freeze_mode.turn_off()
 
 
 async def keepalive(
@@ -151,27 +182,36 @@ async def keepalive(
     """
     An ever-running coroutine to regularly send our own keep-alive status for the peers.
     """
+    # How often do we update. Keep limited to avoid k8s api flooding.
+    # Should be slightly less than the lifetime, enough for a patch request to finish.
+    # The lifetime is set once at the operator's startup, so it is not re-read on every cycle.
+    # The actual sleeps are slightly jittered, so that the operators started at the same time
+    # do not send their keep-alives in synchronised bursts.
+    sleep_for = max(1, int(settings.peering.lifetime - 10))
+    resource = guess_resource(namespace=namespace)
     try:
         while True:
             await touch(
                 identity=identity,
                 settings=settings,
                 namespace=namespace,
+                resource=resource,
             )
-
-            # How often do we update. Keep limited to avoid k8s api flooding.
-            # Should be slightly less than the lifetime, enough for a patch request to finish.
-            await asyncio.sleep(max(1, int(settings.peering.lifetime - 10)))
+            await asyncio.sleep(sleep_for * random.uniform(0.9, 1.0))
     finally:
+        # Do not block the operator's exit for long if the API is unresponsive at that moment.
         try:
-            await asyncio.shield(touch(
+            await asyncio.wait_for(asyncio.shield(touch(
                 identity=identity,
                 settings=settings,
                 namespace=namespace,
+                resource=resource,
                 lifetime=0,
-            ))
+            )), timeout=settings.peering.clean_up_timeout)
         except asyncio.CancelledError:
             pass
+        except asyncio.TimeoutError:
+            logger.warning(f"Couldn't remove self from the peering in time. Ignoring.")
         except Exception:
             logger.exception(f"Couldn't remove self from the peering. Ignoring.")
 
@@ -181,30 +221,52 @@ async def touch(
         identity: Identity,
         settings: configuration.OperatorSettings,
         namespace: Optional[str],
+        resource: Optional[resources.Resource] = None,
         lifetime: Optional[int] = None,
 ) -> None:
-    name = settings.peering.name
-    resource = guess_resource(namespace=namespace)
-
-    peer = Peer(
-        identity=identity,
-        priority=settings.peering.priority,
-        lifetime=settings.peering.lifetime if lifetime is None else lifetime,
+    peering = settings.peering
+    name = peering.name
+    resource = resource if resource is not None else guess_resource(namespace=namespace)
+
+    payload = _build_own_status_payload(
+        priority=peering.priority,
+        lifetime=peering.lifetime if lifetime is None else lifetime,
+        now=datetime.datetime.utcnow(),
     )
 
     patch = patches.Patch()
-    patch.update({'status': {identity: None if peer.is_dead else peer.as_dict()}})
+    patch['status'] = {identity: payload}
     rsp = await patching.patch_obj(resource=resource, namespace=namespace, name=name, patch=patch)
 
-    if not settings.peering.stealth or rsp is None:
+    if not peering.stealth or rsp is None:
         where = f"in {namespace!r}" if namespace else "cluster-wide"
         result = "not found" if rsp is None else "ok"
         logger.debug(f"Keep-alive in {name!r} {where}: {result}.")
 
 
+def _build_own_status_payload(
+        *,
+        priority: int,
+        lifetime: int,
+        now: datetime.datetime,
+) -> Optional[Dict[str, Any]]:
+    """
+    Build our own peer's status as `Peer.as_dict` does, but without a full `Peer` object.
+
+    A non-positive lifetime means that we are already dead, i.e. to be removed.
+    """
+    if lifetime <= 0:
+        return None
+    return {
+        'priority': priority,
+        'lastseen': now.isoformat(),
+        'lifetime': float(lifetime),
+    }
+
+
 async def clean(
         *,
-        peers: Iterable[Peer],
+        identities: Iterable[Identity],
         settings: configuration.OperatorSettings,
         namespace: Optional[str],
 ) -> None:
@@ -212,7 +274,7 @@ async def clean(
     resource = guess_resource(namespace=namespace)
 
     patch = patches.Patch()
-    patch.update({'status': {peer.identity: None for peer in peers}})
+    patch['status'] = {identity: None for identity in identities}
     await patching.patch_obj(resource=resource, namespace=namespace, name=name, patch=patch)
 
 
@@ -222,13 +284,14 @@ async def detect_presence(
         namespace: Optional[str],
 ) -> Optional[bool]:
 
-    if settings.peering.standalone:
+    peering = settings.peering
+    if peering.standalone:
         return None
 
     resource = guess_resource(namespace=namespace)
-    name = settings.peering.name
+    name = peering.name
     obj = await fetching.read_obj(resource=resource, namespace=namespace, name=name, default=None)
-    if settings.peering.mandatory and obj is None:
+    if peering.mandatory and obj is None:
         raise Exception(f"The mandatory peering {name!r} was not found.")
     elif obj is None:
         logger.warning(f"Default peering object is not found, falling back to the standalone mode.")
@@ -264,7 +327,7 @@ def detect_own_id(*, manual: bool) -> Identity:
     user = getpass.getuser()
     host = hostnames.get_descriptive_hostname()
     now = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    rnd = ''.join(random.choices('abcdefhijklmnopqrstuvwxyz0123456789', k=3))
+    rnd = ''.join(random.choices(_ID_ALPHABET, k=3))
     return Identity(f'{user}@{host}' if manual else f'{user}@{host}/{now}/{rnd}')
 
 
@@ -121,6 +121,14 @@ class PeeringSettings:
     slightly faster than their records expires (5-10 seconds earlier).
     """
 
+    clean_up_timeout: float = 5.0
+    """
+    For how long (in seconds) the operator tries to remove its own record
+    from the peering object on exit. If the Kubernetes API does not respond
+    in time, the record is left to expire by its lifetime, so that the exit
+    is not blocked by the unresponsive API.
+    """
+
     mandatory: bool = False
     """
     Is peering mandatory for this operator, or optional? If it is mandatory,
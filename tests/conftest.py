@@ -51,35 +51,35 @@ def pytest_pycollect_makeitem(collector, name, obj):
     yield
 
 
+# Mark all e2e tests, no matter how they were detected. Just for filtering.
+_MARK_E2E = pytest.mark.e2e
+
+# Minikube tests are heavy and require a cluster. Skip them by default,
+# so that the contributors can run pytest without initial tweaks.
+_MARK_SKIP_E2E = pytest.mark.skip(reason="E2E tests are not enabled. "
+                                         "Use --with-e2e/--only-e2e to enable.")
+
+
 # This logic is not applied if pytest is started explicitly on ./examples/.
 # In that case, regular pytest behaviour applies -- this is intended.
 def pytest_collection_modifyitems(config, items):
+    only_e2e = config.getoption('--only-e2e')
+    skip_e2e = not config.getoption('--with-e2e') and not only_e2e
 
     # Put all e2e tests to the end, as they are assumed to be slow.
-    def _is_e2e(item):
-        path = item.location[0]
-        return path.startswith('tests/e2e/') or path.startswith('examples/')
-    etc = [item for item in items if not _is_e2e(item)]
-    e2e = [item for item in items if _is_e2e(item)]
-
-    # Mark all e2e tests, no matter how they were detected. Just for filtering.
-    mark_e2e = pytest.mark.e2e
-    for item in e2e:
-        item.add_marker(mark_e2e)
-
-    # Minikube tests are heavy and require a cluster. Skip them by default,
-    # so that the contributors can run pytest without initial tweaks.
-    mark_skip = pytest.mark.skip(reason="E2E tests are not enabled. "
-                                        "Use --with-e2e/--only-e2e to enable.")
-    if not config.getoption('--with-e2e') and not config.getoption('--only-e2e'):
-        for item in e2e:
-            item.add_marker(mark_skip)
+    etc = []
+    e2e = []
+    for item in items:
+        if item.location[0].startswith(('tests/e2e/', 'examples/')):
+            item.add_marker(_MARK_E2E)
+            if skip_e2e:
+                item.add_marker(_MARK_SKIP_E2E)
+            e2e.append(item)
+        else:
+            etc.append(item)
 
     # Minify the test-plan if only e2e are requested (all other should be skipped).
-    if config.getoption('--only-e2e'):
-        items[:] = e2e
-    else:
-        items[:] = etc + e2e
+    items[:] = e2e if only_e2e else etc + e2e
 
 
 # Substitute the regular mock with the async-aware mock in the `mocker` fixture.
@@ -543,33 +543,35 @@ def assert_logs(caplog):
     """
     def assert_logs_fn(patterns, prohibited=[], strict=False):
         __traceback_hide__ = True
-        remaining_patterns = list(patterns)
+        remaining_patterns = [re.compile(pattern) for pattern in patterns]
+        prohibited_patterns = [re.compile(pattern) for pattern in prohibited]
         for message in caplog.messages:
             # The expected pattern is at position 0.
             # Looking-ahead: if one of the following patterns matches, while the
             # 0th does not, then the log message is missing, and we fail the test.
             for idx, pattern in enumerate(remaining_patterns):
-                m = re.search(pattern, message)
+                m = pattern.search(message)
                 if m:
                     if idx == 0:
                         remaining_patterns[:1] = []
                         break  # out of `remaining_patterns` cycle
                     else:
-                        skipped_patterns = remaining_patterns[:idx]
+                        skipped_patterns = [p.pattern for p in remaining_patterns[:idx]]
                         raise AssertionError(f"Few patterns were skipped: {skipped_patterns!r}")
                 elif strict:
                     raise AssertionError(f"Unexpected log message: {message!r}")
 
             # Check that the prohibited patterns do not appear in any message.
-            for pattern in prohibited:
-                m = re.search(pattern, message)
+            for pattern in prohibited_patterns:
+                m = pattern.search(message)
                 if m:
-                    raise AssertionError(f"Prohibited log pattern found: {message!r} ~ {pattern!r}")
+                    raise AssertionError(f"Prohibited log pattern found: {message!r} ~ {pattern.pattern!r}")
 
         # If all patterns have been matched in order, we are done.
         # if some are left, but the messages are over, then we fail.
         if remaining_patterns:
-            raise AssertionError(f"Few patterns were missed: {remaining_patterns!r}")
+            missed_patterns = [p.pattern for p in remaining_patterns]
+            raise AssertionError(f"Few patterns were missed: {missed_patterns!r}")
 
     return assert_logs_fn
 
@@ -603,8 +605,7 @@ def _no_asyncio_pending_tasks(event_loop):
     #   <Task pending name='Task-2' coro=<<async_generator_athrow without __name__>()>>
     event_loop.run_until_complete(asyncio.sleep(0))
 
-    # Detect all leftover tasks.
-    after = {t for t in list(asyncio.tasks._all_tasks) if not t.done()}
-    remains = after - before
+    # Detect all leftover tasks in one pass, without building and subtracting another set.
+    remains = [t for t in list(asyncio.tasks._all_tasks) if not t.done() and t not in before]
     if remains:
         pytest.fail(f"Unattended asyncio tasks detected: {remains!r}")
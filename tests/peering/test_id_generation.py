@@ -112,3 +112,11 @@ def test_useless_suffixes_removed(mocker, fqdn):
     mocker.patch('socket.gethostbyaddr', side_effect=lambda fqdn: (fqdn, [], []))
     own_id = detect_own_id(manual=True)
     assert own_id == 'some-user@my-host'
+
+
+def test_suffixes_use_the_full_alphabet(mocker):
+    choices_mock = mocker.patch('random.choices', return_value='random-str')
+    mocker.patch('socket.gethostname', return_value='some-host')
+    mocker.patch('socket.gethostbyaddr', side_effect=lambda fqdn: (fqdn, [], []))
+    detect_own_id(manual=False)
+    assert choices_mock.call_args[0][0] == 'abcdefghijklmnopqrstuvwxyz0123456789'
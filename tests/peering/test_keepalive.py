@@ -1,6 +1,8 @@
+import asyncio
+
 import pytest
 
-from kopf.engines.peering import Peer, keepalive
+from kopf.engines.peering import NAMESPACED_PEERING_RESOURCE, keepalive
 
 
 class StopInfiniteCycleException(Exception):
@@ -18,8 +20,37 @@ async def test_background_task_runs(mocker, settings):
         await keepalive(settings=settings, identity='id', namespace='namespace')
 
     assert sleep_mock.call_count == 3
-    assert sleep_mock.call_args_list[0][0][0] == 33 - 10
-    assert sleep_mock.call_args_list[1][0][0] == 33 - 10
-    assert sleep_mock.call_args_list[2][0][0] == 33 - 10
+    assert (33 - 10) * 0.9 <= sleep_mock.call_args_list[0][0][0] <= 33 - 10
+    assert (33 - 10) * 0.9 <= sleep_mock.call_args_list[1][0][0] <= 33 - 10
+    assert (33 - 10) * 0.9 <= sleep_mock.call_args_list[2][0][0] <= 33 - 10
 
     assert touch_mock.call_count == 4  # 3 updates + 1 clean-up
+    assert all(c[1]['resource'] == NAMESPACED_PEERING_RESOURCE for c in touch_mock.call_args_list)
+
+
+async def test_final_touch_is_time_limited(mocker, settings, assert_logs, caplog):
+
+    released = asyncio.Event()
+    hanging_tasks = []
+
+    async def touch_fn(*, lifetime=None, **_):
+        if lifetime == 0:
+            hanging_tasks.append(asyncio.current_task())
+            await released.wait()  # i.e. the API hangs until the test is over
+
+    touch_mock = mocker.patch('kopf.engines.peering.touch', side_effect=touch_fn)
+    mocker.patch('asyncio.sleep', side_effect=StopInfiniteCycleException)
+
+    caplog.set_level(0)
+    settings.peering.clean_up_timeout = 0.1
+    with pytest.raises(StopInfiniteCycleException):
+        await asyncio.wait_for(keepalive(settings=settings, identity='id', namespace='namespace'),
+                               timeout=1.0)
+
+    assert touch_mock.call_count == 2  # 1 update + 1 clean-up
+    assert touch_mock.call_args[1]['lifetime'] == 0
+    assert_logs(["Couldn't remove self from the peering in time"])
+
+    # The shielded touch continues in the background; let it finish to not leave it pending.
+    released.set()
+    await asyncio.gather(*hanging_tasks)
@@ -3,7 +3,7 @@ import freezegun
 import pytest
 
 from kopf.engines.peering import CLUSTER_PEERING_RESOURCE, \
-                                 NAMESPACED_PEERING_RESOURCE, Peer, clean, touch
+                                 NAMESPACED_PEERING_RESOURCE, clean, touch
 
 
 @pytest.mark.usefixtures('with_both_crds')
@@ -11,21 +11,15 @@ from kopf.engines.peering import CLUSTER_PEERING_RESOURCE, \
     pytest.param('ns', NAMESPACED_PEERING_RESOURCE, id='namespace-scoped'),
     pytest.param(None, CLUSTER_PEERING_RESOURCE, id='cluster-scoped'),
 ])
-@pytest.mark.parametrize('lastseen', [
-    pytest.param('2020-01-01T00:00:00', id='when-dead'),
-    pytest.param('2020-12-31T23:59:59', id='when-alive'),
-])
-@freezegun.freeze_time('2020-12-31T23:59:59.123456')
 async def test_cleaning_peers_purges_them(
-        hostname, aresponses, resp_mocker, namespace, peering_resource, settings, lastseen):
+        hostname, aresponses, resp_mocker, namespace, peering_resource, settings):
 
     settings.peering.name = 'name0'
     patch_mock = resp_mocker(return_value=aiohttp.web.json_response({}))
     url = peering_resource.get_url(name='name0', namespace=namespace)
     aresponses.add(hostname, url, 'patch', patch_mock)
 
-    peer = Peer(identity='id1', lastseen=lastseen)
-    await clean(peers=[peer], settings=settings, namespace=namespace)
+    await clean(identities=['id1'], settings=settings, namespace=namespace)
 
     assert patch_mock.called
     patch = await patch_mock.call_args_list[0][0][0].json()
@@ -1,8 +1,10 @@
 import datetime
 
 import freezegun
+import iso8601
+import pytest
 
-from kopf.engines.peering import Peer
+from kopf.engines.peering import Peer, _parse_date_cached
 
 
 @freezegun.freeze_time('2020-12-31T23:59:59.123456')
@@ -97,3 +99,40 @@ def test_creation_as_dead():
     assert peer.lastseen == datetime.datetime(2020, 12, 31, 23, 59, 49, 123456)
     assert peer.deadline == datetime.datetime(2020, 12, 31, 23, 59, 59, 123456)
     assert peer.is_dead is True
+
+
+@freezegun.freeze_time('2020-12-31T23:59:59.123456')
+def test_creation_with_lastseen_as_repeated_string():
+    _parse_date_cached.cache_clear()
+    peer1 = Peer(identity='id1', lastseen='2020-01-01T12:34:56.789123+00:00')
+    peer2 = Peer(identity='id2', lastseen='2020-01-01T12:34:56.789123+00:00')
+    assert _parse_date_cached.cache_info().hits == 1
+    assert peer1.lastseen == datetime.datetime(2020, 1, 1, 12, 34, 56, 789123)
+    assert peer2.lastseen == datetime.datetime(2020, 1, 1, 12, 34, 56, 789123)
+    assert peer1.lastseen.tzinfo is None
+    assert peer2.lastseen.tzinfo is None
+
+
+@freezegun.freeze_time('2020-12-31T23:59:59.123456')
+def test_creation_with_explicit_now():
+    peer = Peer(
+        identity='id',
+        lifetime=10,
+        lastseen='2020-12-31T23:59:50.123456',
+        now=datetime.datetime(2021, 1, 1, 0, 0, 0, 123456),  # 10 seconds after "lastseen"
+    )
+    assert peer.deadline == datetime.datetime(2021, 1, 1, 0, 0, 0, 123456)
+    assert peer.is_dead is True
+
+
+@freezegun.freeze_time('2020-12-31T23:59:59.123456')
+def test_creation_with_lastseen_unspecified_and_explicit_now():
+    peer = Peer(identity='id', now=datetime.datetime(2020, 1, 1, 12, 34, 56, 789123))
+    assert peer.lastseen == datetime.datetime(2020, 1, 1, 12, 34, 56, 789123)
+
+
+@freezegun.freeze_time('2020-12-31T23:59:59.123456')
+@pytest.mark.parametrize('lastseen', [1577836800, ['2020-01-01T12:34:56'], {}])
+def test_creation_with_lastseen_as_non_string(lastseen):
+    with pytest.raises(iso8601.ParseError):
+        Peer(identity='id', lastseen=lastseen)
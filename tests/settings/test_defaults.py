@@ -10,6 +10,7 @@ async def test_declared_public_interface_and_promised_defaults():
     assert settings.peering.stealth == False
     assert settings.peering.priority == 0
     assert settings.peering.lifetime == 60
+    assert settings.peering.clean_up_timeout == 5.0
     assert settings.peering.mandatory == False
     assert settings.peering.standalone == False
     assert settings.watching.reconnect_backoff == 0.1